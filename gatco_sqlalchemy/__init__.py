@@ -5,6 +5,7 @@ import sys
 import time
 from operator import itemgetter
 import warnings
+from contextvars import ContextVar
 from threading import Lock
 import asyncio
 import sqlalchemy
@@ -13,8 +14,9 @@ from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, scoped_session, declarative_base
 from sqlalchemy.orm.exc import UnmappedClassError
 from sqlalchemy.orm import Session as SessionBase
-from sqlalchemy.ext.declarative import DeclarativeMeta
+from sqlalchemy.orm import DeclarativeMeta
 import threading  # Import threading for get_ident
+from weakref import WeakKeyDictionary
 
 
 
@@ -22,8 +24,71 @@ from .model import Model, DefaultMeta
 
 __version__ = '0.1.0'
 
-def itervalues(d):
-    return iter(d.values())
+#: Scope token for the current request, set by the ``request`` middleware
+#: installed in :meth:`SQLAlchemy.init_app` and cleared again once the
+#: response middleware removed the session. Tasks spawned by a handler copy
+#: it, so sessions are keyed on ``(token, task)``: every such task gets a
+#: session of its own and has to call ``db.session.remove()`` itself, as only
+#: the handler's session is removed with the response.
+_request_ctx = ContextVar('gatco_sa_ctx', default=None)
+
+_get_running_loop = asyncio._get_running_loop
+_current_task = asyncio.current_task
+
+def _scopefunc():
+    # Outside of a request (startup hooks, background tasks, scripts) the
+    # running task is the scope, or the thread when no loop is running.
+    # _get_running_loop() returns None instead of raising, and passing the
+    # loop on spares current_task() from looking it up a second time.
+    loop = _get_running_loop()
+    task = _current_task(loop) if loop is not None else None
+    ctx = _request_ctx.get()
+    if ctx is not None:
+        return ctx, task
+    if task is not None:
+        return task
+    return threading.get_ident()
+
+def _finish_session(session, commit):
+    if not session.registry.has():
+        return
+    try:
+        if commit:
+            session.commit()
+    except:
+        session.rollback()
+        raise
+    finally:
+        session.remove()
+
+async def _finish_async_session(session, commit):
+    if not session.registry.has():
+        return
+    try:
+        if commit:
+            await session.commit()
+    except:
+        await session.rollback()
+        raise
+    finally:
+        await session.remove()
+
+_DEFAULTS = {
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+    'SQLALCHEMY_BINDS': None,
+    'SQLALCHEMY_NATIVE_UNICODE': None,
+    'SQLALCHEMY_ECHO': False,
+    'SQLALCHEMY_RECORD_QUERIES': None,
+    'SQLALCHEMY_POOL_SIZE': None,
+    'SQLALCHEMY_POOL_TIMEOUT': None,
+    'SQLALCHEMY_POOL_RECYCLE': None,
+    'SQLALCHEMY_MAX_OVERFLOW': None,
+    # Size of the compiled statement cache per engine, 0 disables it.
+    'SQLALCHEMY_QUERY_CACHE_SIZE': 1200,
+    'SQLALCHEMY_COMMIT_ON_RESPONSE': False,
+    # Run plain ``sqlite`` URLs, the in-memory default included, on aiosqlite.
+    'SQLALCHEMY_USE_AIOSQLITE': False,
+}
 
 def _make_table(db):
     def _make_table(*args, **kwargs):
@@ -51,18 +116,21 @@ def _wrap_with_default_query_class(fn, cls):
         return fn(*args, **kwargs)
     return newfn
 
-def _include_sqlalchemy(obj, cls):
-    # for module in sqlalchemy, sqlalchemy.orm:
-    #     for key in module.__all__:
-    #         if not hasattr(obj, key):
-    #             setattr(obj, key, getattr(module, key))
+def _sqlalchemy_exports():
+    exports = {}
     exclude_keys = {'engine'}
     for module in sqlalchemy, sqlalchemy.orm:
         for key in dir(module):
             if key.startswith('_') or key in exclude_keys:
                 continue
-            if not hasattr(obj, key):
-                setattr(obj, key, getattr(module, key))
+            exports.setdefault(key, getattr(module, key))
+    return exports
+
+#: Public names of ``sqlalchemy`` and ``sqlalchemy.orm``, served as attributes
+#: of :class:`SQLAlchemy` instances by :meth:`SQLAlchemy.__getattr__`.
+_SA_EXPORTS = _sqlalchemy_exports()
+
+def _include_sqlalchemy(obj, cls):
     obj.Table = _make_table(obj)
     obj.relationship = _wrap_with_default_query_class(orm.relationship, cls)
     obj.relation = _wrap_with_default_query_class(orm.relationship, cls)
@@ -72,18 +140,76 @@ def _include_sqlalchemy(obj, cls):
 class SignallingSession(SessionBase):
     def __init__(self, db, autocommit=False, autoflush=True, **options):
         self.app = app = db.get_app()
+        self._sa_state = get_state(app)
         bind = options.pop('bind', None) or db.engine
-        binds = options.pop('binds', db.get_binds(app))
-        SessionBase.__init__(self, autocommit=autocommit, autoflush=autoflush, bind=bind, binds=binds)
+        binds = options.pop('binds', None)
+        if binds is None:
+            binds = db._get_binds(app)
+        #: Rows loaded through :meth:`cache_get`, held until the next flush,
+        #: commit, rollback or close.
+        self._req_cache = {}
+        SessionBase.__init__(self, autocommit=autocommit, autoflush=autoflush, bind=bind, binds=binds, **options)
+
+    def cache_get(self, entity, ident):
+        """Like :meth:`get`, but keeps a strong reference to the result for
+        the rest of the request. The identity map only holds weak references,
+        so an instance nobody kept hold of is otherwise fetched again.
+        """
+        mapper = inspect(entity)
+        if isinstance(ident, dict):
+            ident = tuple(ident[mapper.get_property_by_column(column).key] for column in mapper.primary_key)
+        elif isinstance(ident, (list, tuple)):
+            ident = tuple(ident)
+        else:
+            ident = (ident,)
+        # Keyed on the requested mapper rather than the identity key, which
+        # names the base class of a polymorphic hierarchy.
+        key = (mapper, ident)
+        rv = self._req_cache.get(key)
+        if rv is not None:
+            # Drop entries expunged or marked for deletion since they were
+            # cached, and let get() decide about them again.
+            state = inspect(rv)
+            if state.session is self and state.persistent and isinstance(rv, mapper.class_) and rv not in self.deleted:
+                return rv
+            del self._req_cache[key]
+        rv = self.get(entity, ident)
+        if rv is not None and rv not in self.deleted:
+            self._req_cache[key] = rv
+        return rv
+
+    def close(self):
+        self._req_cache.clear()
+        SessionBase.close(self)
 
     def get_bind(self, mapper=None, clause=None, bind=None, **kw):
         if mapper is not None:
-            info = getattr(mapper.persist_selectable, 'info', {})
-            bind_key = info.get('bind_key')
-            if bind_key is not None:
-                state = get_state(self.app)
-                return state.db.get_engine(self.app, bind=bind_key)
-        return SessionBase.get_bind(self, bind)
+            state = self._sa_state
+            try:
+                engine = state.mapper_binds[mapper]
+            except KeyError:
+                info = getattr(mapper.persist_selectable, 'info', {})
+                bind_key = info.get('bind_key')
+                engine = None
+                if bind_key is not None:
+                    engine = state.db.get_engine(self.app, bind=bind_key)
+                    # The sync session underneath an AsyncSession needs the
+                    # sync facade of an async engine.
+                    engine = getattr(engine, 'sync_engine', engine)
+                state.mapper_binds[mapper] = engine
+            if engine is not None:
+                return engine
+        return SessionBase.get_bind(self, mapper, clause=clause, bind=bind, **kw)
+
+@event.listens_for(SignallingSession, 'after_flush')
+@event.listens_for(SignallingSession, 'after_commit')
+@event.listens_for(SignallingSession, 'after_rollback')
+def _clear_request_cache(session, *args):
+    session._req_cache.clear()
+
+class _ScopedSession(orm.scoped_session):
+    def cache_get(self, entity, ident):
+        return self.registry().cache_get(entity, ident)
 
 class BaseQuery(orm.Query):
     pass
@@ -91,14 +217,25 @@ class BaseQuery(orm.Query):
 class _QueryProperty(object):
     def __init__(self, sa):
         self.sa = sa
+        #: ``{model: (mapper, query_class)}`` filled on first access.
+        self._mapper_cache = WeakKeyDictionary()
 
     def __get__(self, obj, type):
         try:
-            mapper = orm.class_mapper(type)
-            if mapper:
-                return type.query_class(mapper, session=self.sa.session())
-        except UnmappedClassError:
-            return None
+            mapper, query_class = self._mapper_cache[type]
+        except KeyError:
+            try:
+                mapper = orm.class_mapper(type)
+            except UnmappedClassError:
+                return None
+            query_class = type.query_class
+            self._mapper_cache[type] = (mapper, query_class)
+        if not isinstance(self.sa.session, orm.scoped_session):
+            raise RuntimeError(
+                '%s.query is not available with an async database driver, use '
+                'await db.session.execute(db.select(%s)) instead.' % (type.__name__, type.__name__)
+            )
+        return query_class(mapper, session=self.sa.session())
 
 class _EngineConnector(object):
     def __init__(self, sa, app, bind=None):
@@ -108,28 +245,34 @@ class _EngineConnector(object):
         self._connected_for = None
         self._bind = bind
         self._lock = Lock()
+        self._parsed_uris = get_state(app).parsed_uris
 
     def get_uri(self):
-        if self._bind is None:
-            return self._app.config.get('SQLALCHEMY_DATABASE_URI')
-        binds = self._app.config.get('SQLALCHEMY_BINDS') or ()
-        assert self._bind in binds, 'Bind %r is not specified. Set it in the SQLALCHEMY_BINDS configuration variable' % self._bind
-        return binds[self._bind]
+        assert self._bind in self._parsed_uris, 'Bind %r is not specified. Set it in the SQLALCHEMY_BINDS configuration variable' % self._bind
+        return self._parsed_uris[self._bind]
 
     def get_engine(self):
+        info = self.get_uri()
+        echo = self._app.config.get('SQLALCHEMY_ECHO')
+        # Engines are built once and then only read, so the lock is only
+        # taken on a miss and the check is repeated under it.
+        if (info, echo) == self._connected_for:
+            return self._engine
         with self._lock:
-            uri = self.get_uri()
-            echo = self._app.config.get('SQLALCHEMY_ECHO')
-            if (uri, echo) == self._connected_for:
+            if (info, echo) == self._connected_for:
                 return self._engine
-            info = make_url(uri)
             options = {}
             self._sa.apply_pool_defaults(self._app, options)
             self._sa.apply_driver_hacks(self._app, info, options)
             if echo:
                 options['echo'] = echo
-            self._engine = rv = sqlalchemy.create_engine(info, **options)
-            self._connected_for = (uri, echo)
+            if info.get_dialect().is_async:
+                from sqlalchemy.ext.asyncio import create_async_engine
+                rv = create_async_engine(info, **options)
+            else:
+                rv = sqlalchemy.create_engine(info, **options)
+            self._engine = rv
+            self._connected_for = (info, echo)
             return rv
 
 def get_state(app):
@@ -140,6 +283,16 @@ class _SQLAlchemyState(object):
     def __init__(self, db):
         self.db = db
         self.connectors = {}
+        #: ``(key, {table: engine})`` computed by :meth:`SQLAlchemy._get_binds`.
+        self.binds_cache = None
+        #: ``{mapper: engine or None}`` resolved by
+        #: :meth:`SignallingSession.get_bind` from the table's bind key.
+        self.mapper_binds = {}
+        #: ``{bind_key: URL}`` parsed once from the configuration by
+        #: :meth:`SQLAlchemy.init_app`, ``None`` being the default database.
+        self.parsed_uris = {}
+        #: Whether the default database uses an async driver.
+        self.is_async = False
 
 class SQLAlchemy(object):
     Query = None
@@ -147,51 +300,49 @@ class SQLAlchemy(object):
     def __init__(self, app=None, use_native_unicode=True, session_options=None, metadata=None, query_class=BaseQuery, model_class=Model):
         self.use_native_unicode = use_native_unicode
         self.Query = query_class
-        self.session = self.create_scoped_session(session_options)
+        self.session_options = dict(session_options or {})
+        self.session = self.create_scoped_session(dict(self.session_options))
         self.Model = self.make_declarative_base(model_class, metadata)
         self._engine_lock = Lock()
+        #: ``(tables, {bind_key: tables})`` built by :meth:`get_tables_for_bind`.
+        self._bind_index = None
         self.app = app
         _include_sqlalchemy(self, query_class)
         if app is not None:
             self.init_app(app)
 
+    def __getattr__(self, name):
+        try:
+            return _SA_EXPORTS[name]
+        except KeyError:
+            raise AttributeError('%r object has no attribute %r' % (self.__class__.__name__, name)) from None
+
     @property
     def metadata(self):
         return self.Model.metadata
 
     def create_scoped_session(self, options=None):
-        # if options is None:
-        #     options = {}
-        # scopefunc = options.pop('scopefunc', asyncio.current_task)
-        # options['query_cls'] = options['query_cls'] if 'query_cls' in options else self.Query
-        # return scoped_session(self.create_session(options), scopefunc=scopefunc)
         if options is None:
             options = {}
-        # Custom scope function to ensure an event loop is available
-        def scopefunc():
-            task = asyncio.current_task()
-            if task:
-                return task
-            else:
-                return threading.get_ident()
-
-            # try:
-            #     # Try to get the current running task (which implies there's an event loop)
-            #     return await asyncio.Task.current_task()
-            # except RuntimeError:
-            #     # If no event loop is running, create a new one
-            #     if not asyncio.get_event_loop().is_running():
-            #         loop = asyncio.new_event_loop()
-            #         asyncio.set_event_loop(loop)
-            #     return await asyncio.Task.current_task()
-        options['scopefunc'] = options.get('scopefunc', scopefunc)
+        scopefunc = options.pop('scopefunc', _scopefunc)
         options['query_cls'] = options['query_cls'] if 'query_cls' in options else self.Query
-        return orm.scoped_session(self.create_session(options), scopefunc=scopefunc)
+        return _ScopedSession(self.create_session(options), scopefunc=scopefunc)
 
+    def create_async_scoped_session(self, options=None):
+        if options is None:
+            options = {}
+        scopefunc = options.pop('scopefunc', _scopefunc)
+        options['query_cls'] = options['query_cls'] if 'query_cls' in options else self.Query
+        from .async_session import _AsyncScopedSession
+        return _AsyncScopedSession(self.create_async_session(options), scopefunc=scopefunc)
 
     def create_session(self, options):
         return sessionmaker(class_=SignallingSession, db=self, **options)
 
+    def create_async_session(self, options):
+        from .async_session import SignallingAsyncSession
+        return sessionmaker(class_=SignallingAsyncSession, sync_session_class=SignallingSession, db=self, **options)
+
     def make_declarative_base(self, model, metadata=None):
         if not isinstance(model, DeclarativeMeta):
             model = declarative_base(cls=model, name='Model', metadata=metadata, metaclass=DefaultMeta)
@@ -205,30 +356,79 @@ class SQLAlchemy(object):
     def init_app(self, app):
         if 'SQLALCHEMY_DATABASE_URI' not in app.config and 'SQLALCHEMY_BINDS' not in app.config:
             warnings.warn('Neither SQLALCHEMY_DATABASE_URI nor SQLALCHEMY_BINDS is set. Defaulting SQLALCHEMY_DATABASE_URI to "sqlite:///:memory:".')
-        app.config['SQLALCHEMY_DATABASE_URI'] = app.config.get('SQLALCHEMY_DATABASE_URI') or 'sqlite:///:memory:'
-        app.config['SQLALCHEMY_BINDS'] = app.config.get('SQLALCHEMY_BINDS') or None
-        app.config['SQLALCHEMY_NATIVE_UNICODE'] = app.config.get('SQLALCHEMY_NATIVE_UNICODE') or None
-        app.config['SQLALCHEMY_ECHO'] = app.config.get('SQLALCHEMY_ECHO') or False
-        app.config['SQLALCHEMY_RECORD_QUERIES'] = app.config.get('SQLALCHEMY_RECORD_QUERIES') or None
-        app.config['SQLALCHEMY_POOL_SIZE'] = app.config.get('SQLALCHEMY_POOL_SIZE') or None
-        app.config['SQLALCHEMY_POOL_TIMEOUT'] = app.config.get('SQLALCHEMY_POOL_TIMEOUT') or None
-        app.config['SQLALCHEMY_POOL_RECYCLE'] = app.config.get('SQLALCHEMY_POOL_RECYCLE') or None
-        app.config['SQLALCHEMY_MAX_OVERFLOW'] = app.config.get('SQLALCHEMY_MAX_OVERFLOW') or None
-        app.config['SQLALCHEMY_COMMIT_ON_RESPONSE'] = app.config.get('SQLALCHEMY_COMMIT_ON_RESPONSE') or False
+        for key, value in _DEFAULTS.items():
+            app.config.setdefault(key, value)
+        # Unlike the other settings, None or an empty string, as left by
+        # os.environ.get('DATABASE_URL', ''), still means the default database
+        # rather than being handed to make_url().
+        if not app.config['SQLALCHEMY_DATABASE_URI']:
+            app.config['SQLALCHEMY_DATABASE_URI'] = _DEFAULTS['SQLALCHEMY_DATABASE_URI']
         self.app = app
         if not hasattr(app, 'extensions') or app.extensions is None:
             app.extensions = {}
-        app.extensions['sqlalchemy'] = _SQLAlchemyState(self)
-        @app.middleware('response')
-        async def shutdown_session(request, response):
-            try:
-                if app.config['SQLALCHEMY_COMMIT_ON_RESPONSE']:
-                    self.session.commit()
-            except:
-                self.session.rollback()
-                raise
-            finally:
-                self.session.remove()
+        app.extensions['sqlalchemy'] = state = _SQLAlchemyState(self)
+        state.parsed_uris = {
+            key: make_url(uri) for key, uri in (app.config['SQLALCHEMY_BINDS'] or {}).items()
+        }
+        state.parsed_uris[None] = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+        if state.parsed_uris[None].get_dialect().is_async or app.config['SQLALCHEMY_USE_AIOSQLITE']:
+            # An AsyncSession needs every bind to be async, so sync sqlite
+            # URLs are moved onto aiosqlite. Only the stdlib driver can be:
+            # another DBAPI, e.g. pysqlcipher, would lose what it adds.
+            for key, info in state.parsed_uris.items():
+                if info.get_backend_name() != 'sqlite' or info.get_dialect().is_async:
+                    continue
+                if info.drivername not in ('sqlite', 'sqlite+pysqlite'):
+                    raise RuntimeError(
+                        'Cannot run %s on aiosqlite: only sqlite and sqlite+pysqlite '
+                        'URLs are rewritten, not %s.' % (
+                            'SQLALCHEMY_DATABASE_URI' if key is None else 'SQLALCHEMY_BINDS[%r]' % key,
+                            info.drivername,
+                        )
+                    )
+                state.parsed_uris[key] = info.set(drivername='sqlite+aiosqlite')
+        state.is_async = state.parsed_uris[None].get_dialect().is_async
+        # One session serves every bind, so they must all be async or all
+        # be sync; a mix would only fail once a session is used.
+        mismatched = sorted(
+            'SQLALCHEMY_DATABASE_URI' if key is None else 'SQLALCHEMY_BINDS[%r]' % key
+            for key, info in state.parsed_uris.items()
+            if info.get_dialect().is_async != state.is_async
+        )
+        if mismatched:
+            raise RuntimeError(
+                'Cannot mix async and sync database drivers: SQLALCHEMY_DATABASE_URI is %s, but %s not.'
+                % ('async' if state.is_async else 'sync', ', '.join(mismatched))
+            )
+        if state.is_async:
+            self.session = self.create_async_scoped_session(dict(self.session_options))
+
+        @app.middleware('request')
+        async def bind_session_scope(request):
+            _request_ctx.set(object())
+
+        # The commit flag and the session are bound as defaults, so every
+        # response reads them as locals; both are fixed once init_app ran.
+        commit = app.config['SQLALCHEMY_COMMIT_ON_RESPONSE']
+        # A session used before bind_session_scope ran, e.g. by request
+        # middleware registered ahead of init_app, is keyed on the bare task.
+        # Once the token is cleared the second pass finishes that one too.
+        if state.is_async:
+            @app.middleware('response')
+            async def shutdown_session(request, response, _commit=commit, _session=self.session):
+                try:
+                    await _finish_async_session(_session, _commit)
+                finally:
+                    _request_ctx.set(None)
+                    await _finish_async_session(_session, _commit)
+        else:
+            @app.middleware('response')
+            async def shutdown_session(request, response, _commit=commit, _session=self.session):
+                try:
+                    _finish_session(_session, _commit)
+                finally:
+                    _request_ctx.set(None)
+                    _finish_session(_session, _commit)
 
     def apply_pool_defaults(self, app, options):
         def _setdefault(optionkey, configkey):
@@ -239,6 +439,7 @@ class SQLAlchemy(object):
         _setdefault('pool_timeout', 'SQLALCHEMY_POOL_TIMEOUT')
         _setdefault('pool_recycle', 'SQLALCHEMY_POOL_RECYCLE')
         _setdefault('max_overflow', 'SQLALCHEMY_MAX_OVERFLOW')
+        _setdefault('query_cache_size', 'SQLALCHEMY_QUERY_CACHE_SIZE')
 
     def apply_driver_hacks(self, app, info, options):
         if info.drivername.startswith('mysql'):
@@ -246,7 +447,7 @@ class SQLAlchemy(object):
             if info.drivername != 'mysql+gaerdbms':
                 options.setdefault('pool_size', 10)
                 options.setdefault('pool_recycle', 7200)
-        elif info.drivername == 'sqlite':
+        elif info.get_backend_name() == 'sqlite':
             pool_size = options.get('pool_size')
             detected_in_memory = False
             if info.database in (None, '', ':memory:'):
@@ -262,6 +463,19 @@ class SQLAlchemy(object):
             elif not pool_size:
                 from sqlalchemy.pool import NullPool
                 options['poolclass'] = NullPool
+        else:
+            # SQLAlchemy's 5 + 10 connections are exhausted by concurrent
+            # requests long before the database itself is the limit.
+            options.setdefault('pool_size', 25)
+            options.setdefault('max_overflow', 100)
+
+        # Test connections on checkout and retire them before the server's
+        # idle timeout, instead of failing the first query that uses one.
+        # SQLite has no such timeout, and recycling the single StaticPool
+        # connection would throw away an in-memory database.
+        if info.get_backend_name() != 'sqlite':
+            options.setdefault('pool_pre_ping', True)
+            options.setdefault('pool_recycle', 3600)
 
         unu = app.config['SQLALCHEMY_NATIVE_UNICODE']
         if unu is None:
@@ -280,12 +494,14 @@ class SQLAlchemy(object):
         app = self.get_app(app)
         state = get_state(app)
 
-        with self._engine_lock:
-            connector = state.connectors.get(bind)
-            if connector is None:
-                connector = self.make_connector(app, bind)
-                state.connectors[bind] = connector
-            return connector.get_engine()
+        connector = state.connectors.get(bind)
+        if connector is None:
+            with self._engine_lock:
+                connector = state.connectors.get(bind)
+                if connector is None:
+                    connector = self.make_connector(app, bind)
+                    state.connectors[bind] = connector
+        return connector.get_engine()
 
     def get_app(self, reference_app=None):
         if reference_app is not None:
@@ -297,22 +513,59 @@ class SQLAlchemy(object):
         )
 
     def get_tables_for_bind(self, bind=None):
-        result = []
-        for table in itervalues(self.Model.metadata.tables):
-            if table.info.get('bind_key') == bind:
-                result.append(table)
-        return result
+        # Rebuild whenever the set of tables changed since the last call:
+        # models declared or reflected, tables removed from the metadata.
+        tables = frozenset(self.Model.metadata.tables.values())
+        cached = self._bind_index
+        if cached is not None and cached[0] == tables:
+            return list(cached[1].get(bind, ()))
+        index = {}
+        for table in self.Model.metadata.tables.values():
+            index.setdefault(table.info.get('bind_key'), []).append(table)
+        self._bind_index = (tables, index)
+        return list(index.get(bind, ()))
 
     def get_binds(self, app=None):
+        return dict(self._get_binds(app))
+
+    def _get_binds(self, app=None):
+        # Returns the cached mapping itself, callers must not modify it.
         app = self.get_app(app)
+        state = get_state(app)
         binds = [None] + list(app.config.get('SQLALCHEMY_BINDS') or ())
-        retval = {}
-        for bind in binds:
-            engine = self.get_engine(app, bind)
-            tables = self.get_tables_for_bind(bind)
-            retval.update(dict((table, engine) for table in tables))
+        # The set of Table objects, not just their number, so removing one
+        # table and adding another still rebuilds the mapping.
+        key = (tuple(binds), frozenset(self.Model.metadata.tables.values()))
+        cached = state.binds_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        retval = {
+            table: engine
+            for bind in binds
+            for engine in (self.get_engine(app, bind),)
+            for table in self.get_tables_for_bind(bind)
+        }
+        state.binds_cache = (key, retval)
         return retval
 
+    async def prewarm(self, app=None):
+        """Open a first connection on every bind concurrently, so the
+        connect cost of N binds is paid once at startup instead of by the
+        first requests. Sync engines are connected one after the other.
+        """
+        app = self.get_app(app)
+        binds = [None] + list(app.config.get('SQLALCHEMY_BINDS') or ())
+        engines = [self.get_engine(app, bind) for bind in binds]
+
+        async def connect(engine):
+            async with engine.connect():
+                pass
+
+        for engine in engines:
+            if not hasattr(engine, 'sync_engine'):
+                engine.connect().close()
+        await asyncio.gather(*[connect(engine) for engine in engines if hasattr(engine, 'sync_engine')])
+
     def _execute_for_all_tables(self, app, bind, operation, skip_tables=False):
         app = self.get_app(app)
         if bind == '__all__':
@@ -322,22 +575,52 @@ class SQLAlchemy(object):
         else:
             binds = bind
 
+        state = get_state(app)
+        op = getattr(self.Model.metadata, operation)
+        grouped = self._group_tables_by_engine(app, binds, skip_tables)
+        if state.is_async:
+            # DDL on an async engine has to run from a coroutine, which is
+            # handed back to the caller of create_all/drop_all/reflect.
+            return self._execute_for_all_tables_async(state, op, grouped)
+
+        for engine, extra in grouped.items():
+            with engine.begin() as conn:
+                op(bind=conn, **extra)
+        self._reset_bind_caches(state)
+
+    async def _execute_for_all_tables_async(self, state, op, grouped):
+        for engine, extra in grouped.items():
+            async with engine.begin() as conn:
+                await conn.run_sync(op, **extra)
+        self._reset_bind_caches(state)
+
+    def _group_tables_by_engine(self, app, binds, skip_tables):
+        # One connection and transaction per engine, binds without tables
+        # are left alone.
+        grouped = {}
         for bind in binds:
-            extra = {}
-            if not skip_tables:
-                tables = self.get_tables_for_bind(bind)
-                extra['tables'] = tables
-            op = getattr(self.Model.metadata, operation)
-            op(bind=self.get_engine(app, bind), **extra)
+            engine = self.get_engine(app, bind)
+            if skip_tables:
+                grouped[engine] = {}
+                continue
+            tables = self.get_tables_for_bind(bind)
+            if tables:
+                grouped.setdefault(engine, {'tables': []})['tables'].extend(tables)
+        return grouped
+
+    def _reset_bind_caches(self, state):
+        self._bind_index = None
+        state.binds_cache = None
+        state.mapper_binds.clear()
 
     def create_all(self, bind='__all__', app=None):
-        self._execute_for_all_tables(app, bind, 'create_all')
+        return self._execute_for_all_tables(app, bind, 'create_all')
 
     def drop_all(self, bind='__all__', app=None):
-        self._execute_for_all_tables(app, bind, 'drop_all')
+        return self._execute_for_all_tables(app, bind, 'drop_all')
 
     def reflect(self, bind='__all__', app=None):
-        self._execute_for_all_tables(app, bind, 'reflect', skip_tables=True)
+        return self._execute_for_all_tables(app, bind, 'reflect', skip_tables=True)
 
     def __repr__(self):
         return '<%s engine=%r>' % (
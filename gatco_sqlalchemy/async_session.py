@@ -0,0 +1,27 @@
+from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session
+
+
+class SignallingAsyncSession(AsyncSession):
+    """AsyncSession counterpart of :class:`SignallingSession`, used when the
+    application is configured with an async driver such as
+    ``postgresql+asyncpg``, ``mysql+aiomysql`` or ``sqlite+aiosqlite``.
+    Kept in its own module because :mod:`sqlalchemy.ext.asyncio` requires
+    ``greenlet``, which sync applications do not need.
+    """
+
+    def __init__(self, db, **options):
+        app = db.get_app()
+        bind = options.pop('bind', None) or db.engine
+        binds = options.pop('binds', None)
+        if binds is None:
+            binds = db._get_binds(app)
+        AsyncSession.__init__(self, bind=bind, binds=binds, db=db, **options)
+
+    async def cache_get(self, entity, ident):
+        """Awaitable :meth:`SignallingSession.cache_get`."""
+        return await self.run_sync(lambda session: session.cache_get(entity, ident))
+
+
+class _AsyncScopedSession(async_scoped_session):
+    async def cache_get(self, entity, ident):
+        return await self.registry().cache_get(entity, ident)
@@ -2,7 +2,7 @@ import re
 
 import sqlalchemy as sa
 from sqlalchemy import inspect
-from sqlalchemy.ext.declarative import DeclarativeMeta, declared_attr
+from sqlalchemy.orm import DeclarativeMeta, declared_attr
 
 def should_set_tablename(cls):
     """Determine whether ``__tablename__`` should be automatically generated
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+
+
+class FakeApp(object):
+    """The parts of a Gatco / Sanic app the extension touches: ``config``,
+    ``extensions`` and the ``middleware`` decorator."""
+
+    def __init__(self, config=None):
+        self.config = dict(config or {})
+        self.extensions = None
+        self.middlewares = {'request': [], 'response': []}
+
+    def middleware(self, kind):
+        def decorator(fn):
+            self.middlewares[kind].append(fn)
+            return fn
+        return decorator
+
+    async def handle(self, handler):
+        """Run ``handler`` between the request and response middleware, in
+        the same task, the way the server does."""
+        for fn in self.middlewares['request']:
+            await fn(None)
+        try:
+            return await handler()
+        finally:
+            for fn in self.middlewares['response']:
+                await fn(None, None)
+
+
+@pytest.fixture
+def make_app():
+    return FakeApp
+
+
+@pytest.fixture
+def run():
+    return asyncio.run
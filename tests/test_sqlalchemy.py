@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+import asyncio
+
+import pytest
+import sqlalchemy
+from sqlalchemy import event, inspect
+
+import gatco_sqlalchemy
+from gatco_sqlalchemy import SQLAlchemy
+
+pytestmark = pytest.mark.filterwarnings('ignore:Neither SQLALCHEMY_DATABASE_URI')
+
+
+def count_selects(engine):
+    statements = []
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith('SELECT'):
+            statements.append(statement)
+
+    return statements
+
+
+@pytest.fixture
+def db(make_app):
+    return SQLAlchemy(make_app({'SQLALCHEMY_BINDS': {'other': 'sqlite://'}}))
+
+
+@pytest.fixture
+def User(db):
+    class User(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(20))
+
+    db.create_all()
+    return User
+
+
+def test_default_uri(make_app):
+    for uri in (None, ''):
+        db = SQLAlchemy(make_app({'SQLALCHEMY_DATABASE_URI': uri}))
+        assert db.engine.url.database == ':memory:'
+
+
+def test_create_all_and_round_trip(db, User):
+    db.session.add(User(id=1, name='alice'))
+    db.session.commit()
+    db.session.remove()
+
+    assert db.session.get(User, 1).name == 'alice'
+    assert User.query.filter_by(name='alice').count() == 1
+    assert inspect(db.engine).get_table_names() == ['user']
+
+
+def test_bind_routing_follows_the_metadata(db, User):
+    other = db.get_engine(db.app, 'other')
+    assert db.get_tables_for_bind('other') == []
+
+    class Log(db.Model):
+        __bind_key__ = 'other'
+        id = db.Column(db.Integer, primary_key=True)
+
+    assert db.get_tables_for_bind('other') == [Log.__table__]
+    assert db.get_binds()[Log.__table__] is other
+    session = db.session()
+    assert session.get_bind(inspect(Log)) is other
+    assert session.get_bind(inspect(User)) is db.engine
+
+    db.Model.metadata.remove(Log.__table__)
+    assert db.get_tables_for_bind('other') == []
+    assert Log.__table__ not in db.get_binds()
+
+    audit = db.Table('audit', db.Column('id', db.Integer, primary_key=True), info={'bind_key': 'other'})
+    assert db.get_tables_for_bind('other') == [audit]
+    db.create_all()
+    assert inspect(other).get_table_names() == ['audit']
+
+
+def test_get_binds_returns_a_copy(db, User):
+    db.get_binds().clear()
+    assert User.__table__ in db.get_binds()
+
+
+@pytest.mark.parametrize('uri, binds', [
+    ('sqlite+aiosqlite://', {'other': 'postgresql://localhost/other'}),
+    ('sqlite://', {'other': 'sqlite+aiosqlite://'}),
+])
+def test_mixed_drivers(make_app, uri, binds):
+    app = make_app({'SQLALCHEMY_DATABASE_URI': uri, 'SQLALCHEMY_BINDS': binds})
+    with pytest.raises(RuntimeError, match=r"Cannot mix async and sync .*SQLALCHEMY_BINDS\['other'\]"):
+        SQLAlchemy(app)
+
+
+def test_aiosqlite_keeps_other_sqlite_drivers(make_app):
+    app = make_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite+pysqlcipher://:secret@/db.sqlite',
+        'SQLALCHEMY_USE_AIOSQLITE': True,
+    })
+    with pytest.raises(RuntimeError, match='sqlite\\+pysqlcipher'):
+        SQLAlchemy(app)
+
+
+def test_cache_get_identity_forms(make_app):
+    db = SQLAlchemy(make_app())
+
+    class Pair(db.Model):
+        left = db.Column(db.Integer, primary_key=True)
+        right_id = db.Column('right', db.Integer, primary_key=True)
+
+    db.create_all()
+    db.session.add(Pair(left=1, right_id=2))
+    db.session.commit()
+    selects = count_selects(db.engine)
+
+    session = db.session()
+    pair = session.cache_get(Pair, (1, 2))
+    assert pair is not None
+    assert session.cache_get(Pair, [1, 2]) is pair
+    assert session.cache_get(Pair, {'left': 1, 'right_id': 2}) is pair
+    assert db.session.cache_get(Pair, (1, 2)) is pair
+    assert len(selects) == 1
+    assert session.cache_get(Pair, (2, 1)) is None
+
+
+def test_cache_get_scalar_ident(db, User):
+    db.session.add(User(id=1))
+    db.session.commit()
+    selects = count_selects(db.engine)
+
+    assert db.session.cache_get(User, 1).id == 1
+    # Nothing else refers to the instance, only the cache keeps it loaded.
+    assert db.session.cache_get(User, 1).id == 1
+    assert len(selects) == 1
+
+
+def test_cache_get_invalidation(db, User):
+    db.session.add_all([User(id=1), User(id=2)])
+    db.session.commit()
+    session = db.session()
+
+    user = session.cache_get(User, 1)
+    user.name = 'alice'
+    session.flush()
+    assert session._req_cache == {}
+
+    user = session.cache_get(User, 1)
+    session.expunge_all()
+    fresh = session.cache_get(User, 1)
+    assert fresh is not user
+    assert inspect(fresh).session is session
+
+    session.expunge(fresh)
+    assert session.cache_get(User, 1) is not fresh
+
+    other = session.cache_get(User, 2)
+    session.delete(other)
+    session.cache_get(User, 2)
+    assert (inspect(User), (2,)) not in session._req_cache
+    session.flush()
+    assert session.cache_get(User, 2) is None
+
+    session.close()
+    assert session._req_cache == {}
+
+
+def test_cache_get_polymorphic(make_app):
+    db = SQLAlchemy(make_app())
+
+    class Employee(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        kind = db.Column(db.String(10))
+        __mapper_args__ = {'polymorphic_on': kind, 'polymorphic_identity': 'employee'}
+
+    class Manager(Employee):
+        __mapper_args__ = {'polymorphic_identity': 'manager'}
+
+    db.create_all()
+    db.session.add_all([Employee(id=1), Manager(id=2)])
+    db.session.commit()
+
+    session = db.session()
+    assert type(session.cache_get(Employee, 1)) is Employee
+    assert session.cache_get(Manager, 1) is None
+    manager = session.cache_get(Manager, 2)
+    assert type(manager) is Manager
+    assert session.cache_get(Employee, 2) is manager
+
+
+def test_session_scope_per_request(make_app, run):
+    app = make_app({'SQLALCHEMY_COMMIT_ON_RESPONSE': True})
+    early = []
+
+    @app.middleware('request')
+    async def before_init_app(request):
+        # Registered ahead of the extension's middleware, so it runs
+        # outside of the request scope.
+        early.append(db.session())
+
+    db = SQLAlchemy(app)
+
+    class User(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+
+    db.create_all()
+
+    async def handler():
+        session = db.session()
+        assert session is db.session()
+        assert session is not early[-1]
+        db.session.add(User(id=len(early)))
+
+        async def spawned():
+            await asyncio.sleep(0)
+            return db.session()
+
+        spawned_sessions = await asyncio.gather(spawned(), spawned())
+        assert session not in spawned_sessions
+        assert spawned_sessions[0] is not spawned_sessions[1]
+        for spawned_session in spawned_sessions:
+            spawned_session.close()
+        return session
+
+    async def main():
+        first = await app.handle(handler)
+        assert gatco_sqlalchemy._request_ctx.get() is None
+        assert not db.session.registry.has()
+        second = await app.handle(handler)
+        assert second is not first
+        assert not db.session.registry.has()
+
+    run(main())
+    assert sorted(user.id for user in db.session.query(User)) == [1, 2]
+
+
+def test_rollback_on_failed_commit(make_app, run):
+    app = make_app({'SQLALCHEMY_COMMIT_ON_RESPONSE': True})
+    db = SQLAlchemy(app)
+
+    class User(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+
+    db.create_all()
+
+    async def handler():
+        db.session.add_all([User(id=1), User(id=1)])
+
+    with pytest.raises(sqlalchemy.exc.SQLAlchemyError):
+        run(app.handle(handler))
+    assert gatco_sqlalchemy._request_ctx.get() is None
+    assert db.session.query(User).count() == 0
+
+
+@pytest.fixture
+def async_db(make_app, tmp_path):
+    pytest.importorskip('aiosqlite')
+    return SQLAlchemy(make_app({
+        'SQLALCHEMY_DATABASE_URI': 'sqlite:///%s' % (tmp_path / 'default.db'),
+        'SQLALCHEMY_BINDS': {'other': 'sqlite:///%s' % (tmp_path / 'other.db')},
+        'SQLALCHEMY_USE_AIOSQLITE': True,
+        'SQLALCHEMY_COMMIT_ON_RESPONSE': True,
+    }))
+
+
+def test_aiosqlite_round_trip(async_db, run):
+    db = async_db
+    assert db.engine.url.drivername == 'sqlite+aiosqlite'
+
+    class User(db.Model):
+        id = db.Column(db.Integer, primary_key=True)
+        name = db.Column(db.String(20))
+
+    class Log(db.Model):
+        __bind_key__ = 'other'
+        id = db.Column(db.Integer, primary_key=True)
+
+    with pytest.raises(RuntimeError):
+        User.query
+
+    async def main():
+        await db.create_all()
+
+        async def handler():
+            db.session.add_all([User(id=1, name='alice'), Log(id=1)])
+
+        await db.app.handle(handler)
+        assert not db.session.registry.has()
+
+        async def reader():
+            user = await db.session.cache_get(User, 1)
+            assert await db.session.cache_get(User, [1]) is user
+            log = await db.session.get(Log, 1)
+            return user.name, log.id
+
+        return await db.app.handle(reader)
+
+    assert run(main()) == ('alice', 1)
+    other = db.get_engine(db.app, 'other')
+    assert other.url.database.endswith('other.db')